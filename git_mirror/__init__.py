@@ -2,28 +2,63 @@ from .core import (
     RepoID,
     parse_repo_id,
     ensure_mirror,
+    find_fork_reference,
     iter_mirrored_repos,
+    iter_mirrored_repos_with_rel,
     fetch_mirror,
+    is_update_needed,
     fetch_all,
     record_sync_time,
     read_sync_time,
 )
 
-from .gitolite import (
-    ensure_admin_repo,
-    ensure_include_of_mirrors_conf,
-    upsert_mirror_repo,
-    commit_and_push,
-    add_url_to_gitolite,
-    gitolite_path_for,
-    parse_mirrors_conf,
-    configured_mirror_paths,
-    gitolite_path_from_mirror_dir,
-    sync_gitolite_from_disk,
-    status_report,
-)
+# gitolite and submodules helpers are imported on first access (PEP 562)
+_LAZY = {
+    "ensure_admin_repo": "gitolite",
+    "ensure_include_of_mirrors_conf": "gitolite",
+    "upsert_mirror_repo": "gitolite",
+    "upsert_mirror_repos_bulk": "gitolite",
+    "commit_and_push": "gitolite",
+    "add_url_to_gitolite": "gitolite",
+    "GitoliteBatch": "gitolite",
+    "gitolite_path_for": "gitolite",
+    "parse_mirrors_conf": "gitolite",
+    "load_mirrors_conf_index": "gitolite",
+    "MirrorsConfIndex": "gitolite",
+    "configured_mirror_paths": "gitolite",
+    "gitolite_path_from_mirror_dir": "gitolite",
+    "sync_gitolite_from_disk": "gitolite",
+    "status_report": "gitolite",
+    "submodule_urls": "submodules",
+    "mirror_submodules": "submodules",
+}
 
-from .submodules import (
-    submodule_urls,
-    mirror_submodules,
-)
+__all__ = [
+    "RepoID",
+    "parse_repo_id",
+    "ensure_mirror",
+    "find_fork_reference",
+    "iter_mirrored_repos",
+    "iter_mirrored_repos_with_rel",
+    "fetch_mirror",
+    "is_update_needed",
+    "fetch_all",
+    "record_sync_time",
+    "read_sync_time",
+    *_LAZY,
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,34 +3,50 @@
 CLI for git_mirror.
 
 Commands:
-  clone  <url> [--base-dir /path] [--with-submodules]
+  clone  <url> [--base-dir /path] [--with-submodules] [--filter spec]
+         [--reference /path | --reference-forks]
                                        Mirror-clone (or update) a single repo
-  update-all [--base-dir /path]       Fetch all mirrors under base-dir
+  update-all [--base-dir /path] [--jobs N] [--skip-unchanged]
+                                       Fetch all mirrors under base-dir
   list       [--base-dir /path]       List detected mirrors
   mirror-submodules [--base-dir /path]
                                        Mirror submodule repositories for all mirrors
-  gitolite-add <url> ...              Add a mirror to gitolite config
+  gitolite-add <url> [<url> ...] ...
+                                       Add mirrors to gitolite config
   gitolite-sync [--base-dir ...]      Sync gitolite config with on-disk mirrors
   completion [--prog name]            Output shell completion script
   config <key> [value]                Get or set configuration values
 
 Examples:
   git-mirror clone https://github.com/psf/requests.git --base-dir /srv/git
+  git-mirror clone https://github.com/torvalds/linux.git --filter blob:none
+  git-mirror clone https://github.com/someone/linux.git --reference-forks
   git-mirror update-all --base-dir /srv/git
+  git-mirror update-all --base-dir /srv/git --jobs 8
+  git-mirror update-all --base-dir /srv/git --skip-unchanged
   git-mirror mirror-submodules --base-dir /srv/git
+  git-mirror gitolite-add https://github.com/psf/requests.git https://github.com/numpy/numpy.git
   git-mirror config admin-url git@host:gitolite-admin
 """
 
 from __future__ import annotations
 import argparse
+import os
 import shlex
+import sys
 from pathlib import Path
-
-from .core import ensure_mirror, fetch_all, iter_mirrored_repos, record_sync_time
-from .gitolite import add_url_to_gitolite, sync_gitolite_from_disk, status_report
+from typing import Callable, Dict, Optional
+
+from .core import (
+    DEFAULT_JOBS,
+    ensure_mirror,
+    fetch_all,
+    find_fork_reference,
+    iter_mirrored_repos,
+    parse_repo_id,
+    record_sync_time,
+)
 from .config import CONFIG_FILENAME, find_base_dir, load_config, get_value, set_value
-from .submodules import mirror_submodules
-from .systemd import register_user_service
 
 
 def _apply_config(args: argparse.Namespace) -> argparse.Namespace:
@@ -46,8 +62,8 @@ def _apply_config(args: argparse.Namespace) -> argparse.Namespace:
     cfg = load_config(Path(base))
 
     def _maybe(attr: str, key: str) -> None:
-        if getattr(args, attr, None) is None and cfg.has_option("git-mirror", key):
-            setattr(args, attr, cfg.get("git-mirror", key))
+        if getattr(args, attr, None) is None and key in cfg:
+            setattr(args, attr, cfg[key])
 
     _maybe("admin_url", "admin-url")
     _maybe("admin_dir", "admin-dir")
@@ -55,6 +71,18 @@ def _apply_config(args: argparse.Namespace) -> argparse.Namespace:
     _maybe("conf_file", "conf-file")
     _maybe("readers", "readers")
 
+    # Only update-all takes --jobs; other commands never see the setting
+    if getattr(args, "cmd", "") == "update-all":
+        _maybe("jobs", "jobs")
+        if args.jobs is not None:
+            try:
+                jobs = int(args.jobs)
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                raise SystemExit(f"Invalid jobs value {args.jobs!r}: expected a positive integer")
+            args.jobs = jobs
+
     if getattr(args, "readers", None) is None:
         args.readers = "@all"
     if getattr(args, "prefix", None) is None:
@@ -82,22 +110,33 @@ def _apply_config(args: argparse.Namespace) -> argparse.Namespace:
 
 
 def cmd_clone(args: argparse.Namespace) -> int:
-    target = ensure_mirror(args.url, Path(args.base_dir))
+    from .submodules import mirror_submodules
+
+    base = Path(args.base_dir)
+    reference = Path(args.reference) if args.reference else None
+    # Only a fresh clone can borrow objects; skip the fork probe for an existing mirror
+    if reference is None and args.reference_forks and not parse_repo_id(args.url).mirror_dir(base).exists():
+        reference = find_fork_reference(args.url, base)
+    target = ensure_mirror(args.url, base, filter_spec=args.filter, reference=reference)
     print(str(target))
     if getattr(args, "with_submodules", False):
-        for sub in mirror_submodules(target, Path(args.base_dir)):
+        for sub in mirror_submodules(target, base):
             print(str(sub))
     return 0
 
 
 def cmd_update_all(args: argparse.Namespace) -> int:
-    results = fetch_all(Path(args.base_dir))
-    failed = [r for r in results if r[1]]
+    jobs = args.jobs if getattr(args, "jobs", None) is not None else DEFAULT_JOBS
+    failed = 0
+    results = fetch_all(
+        Path(args.base_dir), jobs=jobs, skip_unchanged=bool(args.skip_unchanged)
+    )
     for repo, err in results:
         if err:
-            print(f"[FAIL] {repo} :: {err}")
+            failed += 1
+            print(f"[FAIL] {repo} :: {err}", flush=True)
         else:
-            print(f"[OK]   {repo}")
+            print(f"[OK]   {repo}", flush=True)
     record_sync_time(Path(args.base_dir))
     return 1 if failed else 0
 
@@ -110,6 +149,8 @@ def cmd_list(args: argparse.Namespace) -> int:
 
 
 def cmd_mirror_submodules(args: argparse.Namespace) -> int:
+    from .submodules import mirror_submodules
+
     base = Path(args.base_dir)
     for repo in iter_mirrored_repos(base):
         for sub in mirror_submodules(repo, base):
@@ -118,19 +159,33 @@ def cmd_mirror_submodules(args: argparse.Namespace) -> int:
 
 
 def cmd_gitolite_add(args: argparse.Namespace) -> int:
-    res = add_url_to_gitolite(
-        url=args.url,
-        admin_url=args.admin_url,
-        admin_dir=Path(args.admin_dir),
+    from .gitolite import GitoliteBatch
+
+    # Reject bad URLs before gitolite-admin is cloned or fetched
+    for url in args.url:
+        try:
+            parse_repo_id(url)
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    # One fetch of gitolite-admin and one push for all URLs
+    with GitoliteBatch(
+        args.admin_url,
+        Path(args.admin_dir),
         readers=args.readers,
         prefix=args.prefix,
         mirrors_conf_file=args.conf_file,
-    )
-    print(f"{'UPDATED' if res.changed else 'UNCHANGED'} {res.path} in {res.file}")
+    ) as batch:
+        for url in args.url:
+            batch.add(url)
+    for res in batch.results:
+        print(f"{'UPDATED' if res.changed else 'UNCHANGED'} {res.path} in {res.file}")
     return 0
 
 
 def cmd_gitolite_sync(args: argparse.Namespace) -> int:
+    from .gitolite import sync_gitolite_from_disk
+
     added, pruned = sync_gitolite_from_disk(
         base_dir=Path(args.base_dir),
         admin_url=args.admin_url,
@@ -150,6 +205,8 @@ def cmd_gitolite_sync(args: argparse.Namespace) -> int:
 
 
 def cmd_status(args: argparse.Namespace) -> int:
+    from .gitolite import status_report
+
     report = status_report(
         base_dir=Path(args.base_dir),
         admin_url=getattr(args, "admin_url", None),
@@ -158,8 +215,6 @@ def cmd_status(args: argparse.Namespace) -> int:
         mirrors_conf_file=args.conf_file,
     )
     print(f"Last sync: {report['last_sync'] or 'never'}")
-    for p in report["bad_layout"]:
-        print(f"[BAD LAYOUT] {p}")
     if report["missing_in_config"] is None or report["missing_on_disk"] is None:
         print("Gitolite details not provided; skipping gitolite checks")
     else:
@@ -167,11 +222,7 @@ def cmd_status(args: argparse.Namespace) -> int:
             print(f"[UNCONFIGURED] {p}")
         for p in report["missing_on_disk"]:
             print(f"[MISSING] {p}")
-        if (
-            not report["bad_layout"]
-            and not report["missing_in_config"]
-            and not report["missing_on_disk"]
-        ):
+        if not report["missing_in_config"] and not report["missing_on_disk"]:
             print("[OK] mirrors and config in sync")
     return 0
 
@@ -203,6 +254,8 @@ def cmd_completion(args: argparse.Namespace) -> int:
 
 
 def cmd_register_service(args: argparse.Namespace) -> int:
+    from .systemd import register_user_service
+
     base = Path(args.base_dir) if getattr(args, "base_dir", None) else Path.cwd()
     if getattr(args, "base_dir", None) is None and not (base / CONFIG_FILENAME).exists():
         raise SystemExit("Cannot determine base directory; specify --base-dir")
@@ -211,10 +264,7 @@ def cmd_register_service(args: argparse.Namespace) -> int:
     return 0
 
 
-def _build_parser() -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(prog="git-mirror", description="Mirror-clone and update Git repositories in a GitHub-like layout.")
-    sub = p.add_subparsers(dest="cmd", required=True)
-
+def _add_clone(sub: argparse._SubParsersAction) -> None:
     p_clone = sub.add_parser("clone", help="Mirror-clone or update a single URL")
     p_clone.add_argument("url", help="Git URL (ssh or https)")
     p_clone.add_argument("--base-dir", help="Base directory for mirrors")
@@ -223,24 +273,58 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Also mirror submodule repositories",
     )
+    p_clone.add_argument(
+        "--filter",
+        metavar="SPEC",
+        help="Partial-clone filter for a new mirror, e.g. blob:none (fetches reuse it)",
+    )
+    ref = p_clone.add_mutually_exclusive_group()
+    ref.add_argument(
+        "--reference",
+        metavar="MIRROR",
+        help="Copy shared objects from an existing mirror when cloning instead of downloading them",
+    )
+    ref.add_argument(
+        "--reference-forks",
+        action="store_true",
+        help="Use a mirror of the same repo under another owner that shares history with it as reference",
+    )
     p_clone.set_defaults(func=cmd_clone)
 
+
+def _add_update_all(sub: argparse._SubParsersAction) -> None:
     p_update = sub.add_parser("update-all", help="Fetch updates for all mirrors")
     p_update.add_argument("--base-dir", help="Base directory for mirrors")
+    p_update.add_argument(
+        "--jobs",
+        type=int,
+        help=f"Number of mirrors to fetch concurrently (default: {DEFAULT_JOBS})",
+    )
+    p_update.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Compare refs with git ls-remote first and skip mirrors already up to date",
+    )
     p_update.set_defaults(func=cmd_update_all)
 
+
+def _add_list(sub: argparse._SubParsersAction) -> None:
     p_list = sub.add_parser("list", help="List detected mirror repositories")
     p_list.add_argument("--base-dir", help="Base directory for mirrors")
     p_list.set_defaults(func=cmd_list)
 
+
+def _add_mirror_submodules(sub: argparse._SubParsersAction) -> None:
     p_submods = sub.add_parser(
         "mirror-submodules", help="Mirror submodules for existing mirrors"
     )
     p_submods.add_argument("--base-dir", help="Base directory for mirrors")
     p_submods.set_defaults(func=cmd_mirror_submodules)
 
+
+def _add_gitolite_add(sub: argparse._SubParsersAction) -> None:
     p_gitolite = sub.add_parser("gitolite-add", help="Add a mirror repo ACL to gitolite-admin")
-    p_gitolite.add_argument("url", help="Upstream Git URL (ssh or https)")
+    p_gitolite.add_argument("url", nargs="+", help="Upstream Git URL(s) (ssh or https)")
     p_gitolite.add_argument("--admin-url", help="gitolite-admin repo URL (ssh)")
     p_gitolite.add_argument("--admin-dir", help="Local path for gitolite-admin checkout")
     p_gitolite.add_argument("--readers", help="Readers group or user list (default: @all)")
@@ -248,6 +332,8 @@ def _build_parser() -> argparse.ArgumentParser:
     p_gitolite.add_argument("--conf-file", help="Included conf filename (default: mirrors.conf)")
     p_gitolite.set_defaults(func=cmd_gitolite_add)
 
+
+def _add_gitolite_sync(sub: argparse._SubParsersAction) -> None:
     p_sync = sub.add_parser("gitolite-sync", help="Ensure gitolite mirrors.conf matches on-disk mirrors")
     p_sync.add_argument("--base-dir", help="Root folder of mirrors on disk (e.g., ~git/repositories/mirrors)")
     p_sync.add_argument("--admin-url", help="gitolite-admin repo URL (ssh)")
@@ -258,6 +344,8 @@ def _build_parser() -> argparse.ArgumentParser:
     p_sync.add_argument("--prune", action="store_true", help="Remove config entries whose mirrors are gone on disk")
     p_sync.set_defaults(func=cmd_gitolite_sync)
 
+
+def _add_status(sub: argparse._SubParsersAction) -> None:
     p_status = sub.add_parser("status", help="Report mirrors vs gitolite config")
     p_status.add_argument("--base-dir", help="Root folder of mirrors on disk")
     p_status.add_argument("--admin-url", help="gitolite-admin repo URL (ssh)")
@@ -266,6 +354,8 @@ def _build_parser() -> argparse.ArgumentParser:
     p_status.add_argument("--conf-file", help="Included conf filename (default: mirrors.conf)")
     p_status.set_defaults(func=cmd_status)
 
+
+def _add_register_service(sub: argparse._SubParsersAction) -> None:
     p_reg = sub.add_parser(
         "register-service",
         help="Install a user systemd service and timer for periodic sync",
@@ -276,12 +366,16 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     p_reg.set_defaults(func=cmd_register_service)
 
+
+def _add_config(sub: argparse._SubParsersAction) -> None:
     p_config = sub.add_parser("config", help="Get or set persistent options")
     p_config.add_argument("key", help="Configuration key")
     p_config.add_argument("value", nargs="?", help="Value to set for key")
     p_config.add_argument("--base-dir", help="Root folder to read config from")
     p_config.set_defaults(func=cmd_config)
 
+
+def _add_completion(sub: argparse._SubParsersAction) -> None:
     p_comp = sub.add_parser("completion", help="Print shell completion script")
     p_comp.add_argument(
         "--prog",
@@ -290,16 +384,50 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     p_comp.set_defaults(func=cmd_completion)
 
+
+# Subcommand name -> function registering its parser, in help order
+_SUBCOMMANDS: Dict[str, Callable[[argparse._SubParsersAction], None]] = {
+    "clone": _add_clone,
+    "update-all": _add_update_all,
+    "list": _add_list,
+    "mirror-submodules": _add_mirror_submodules,
+    "gitolite-add": _add_gitolite_add,
+    "gitolite-sync": _add_gitolite_sync,
+    "status": _add_status,
+    "register-service": _add_register_service,
+    "config": _add_config,
+    "completion": _add_completion,
+}
+
+
+def _build_parser(cmd: Optional[str] = None) -> argparse.ArgumentParser:
+    """Build the CLI parser.
+
+    When *cmd* names a known subcommand only that subparser is constructed,
+    which keeps startup cheap; otherwise (help, typos, completion) the full
+    tree is built.
+    """
+    p = argparse.ArgumentParser(prog="git-mirror", description="Mirror-clone and update Git repositories in a GitHub-like layout.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    if cmd in _SUBCOMMANDS:
+        _SUBCOMMANDS[cmd](sub)
+    else:
+        for add in _SUBCOMMANDS.values():
+            add(sub)
     return p
 
 
 def main() -> int:
-    parser = _build_parser()
-    try:
-        import argcomplete
-        argcomplete.autocomplete(parser)  # type: ignore[arg-type]
-    except Exception:
-        pass
+    if "_ARGCOMPLETE" in os.environ:
+        # Completion needs every subcommand; only pay for argcomplete here
+        parser = _build_parser()
+        try:
+            import argcomplete
+            argcomplete.autocomplete(parser)  # type: ignore[arg-type]
+        except Exception:
+            pass
+    else:
+        parser = _build_parser(sys.argv[1] if len(sys.argv) > 1 else None)
     args = parser.parse_args()
     if getattr(args, "cmd", None) == "completion":
         return args.func(args)
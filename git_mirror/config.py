@@ -1,46 +1,81 @@
 from __future__ import annotations
 
-from configparser import ConfigParser
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 
 CONFIG_FILENAME = ".git-mirror.conf"
 SECTION = "git-mirror"
 
+# Parsed configs keyed by resolved path, validated against the file's mtime.
+_CACHE: Dict[Path, Tuple[int, Dict[str, str]]] = {}
+# Start directories for which find_base_dir found no config file.
+_NO_BASE_DIR: Set[Path] = set()
+
 def config_path(base_dir: Path) -> Path:
     """Return the path to the config file inside *base_dir*."""
     return base_dir / CONFIG_FILENAME
 
-def load_config(base_dir: Path) -> ConfigParser:
+def parse_config(text: str) -> Dict[str, str]:
+    """Parse the ``[git-mirror]`` section of *text* into a dict.
+
+    The file is a single INI section of ``key = value`` lines; ``#``/``;``
+    comments and keys in other sections are ignored. Keys are lower-cased.
+    """
+    cfg: Dict[str, str] = {}
+    in_section = False
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line[0] == "[" and line[-1] == "]":
+            in_section = line[1:-1].strip() == SECTION
+            continue
+        if not in_section:
+            continue
+        # Like ConfigParser, split on whichever delimiter comes first
+        eq, colon = line.find("="), line.find(":")
+        cut = colon if eq == -1 or -1 < colon < eq else eq
+        if cut != -1:
+            cfg[line[:cut].strip().lower()] = line[cut + 1:].strip()
+    return cfg
+
+def load_config(base_dir: Path) -> Dict[str, str]:
     """Load configuration from *base_dir*.
 
-    If the file does not exist an empty ConfigParser is returned.
+    If the file does not exist an empty dict is returned. Parsed configs are
+    cached until the file's mtime changes, so the returned dict is shared;
+    use :func:`set_value` to modify it.
     """
-    cfg = ConfigParser()
-    path = config_path(base_dir)
-    if path.exists():
-        cfg.read(path)
+    path = config_path(base_dir).resolve()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _CACHE.pop(path, None)
+        return {}
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    cfg = parse_config(path.read_text(encoding="utf-8"))
+    _CACHE[path] = (mtime, cfg)
     return cfg
 
-def save_config(base_dir: Path, cfg: ConfigParser) -> None:
+def save_config(base_dir: Path, cfg: Dict[str, str]) -> None:
     """Persist *cfg* in *base_dir*."""
     path = config_path(base_dir)
-    with path.open("w") as fh:
-        cfg.write(fh)
+    lines = [f"[{SECTION}]", *(f"{k} = {v}" for k, v in cfg.items())]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    path = path.resolve()
+    _CACHE[path] = (path.stat().st_mtime_ns, cfg)
+    _NO_BASE_DIR.clear()
 
 def get_value(base_dir: Path, key: str, default: Optional[str] = None) -> Optional[str]:
     """Return the value for *key* from config under *base_dir*."""
-    cfg = load_config(base_dir)
-    if cfg.has_option(SECTION, key):
-        return cfg.get(SECTION, key)
-    return default
+    return load_config(base_dir).get(key.lower(), default)
 
 def set_value(base_dir: Path, key: str, value: str) -> None:
     """Set *key* to *value* in config under *base_dir*."""
-    cfg = load_config(base_dir)
-    if not cfg.has_section(SECTION):
-        cfg.add_section(SECTION)
-    cfg.set(SECTION, key, value)
+    cfg = dict(load_config(base_dir))
+    cfg[key.lower()] = value
     save_config(base_dir, cfg)
 
 def find_base_dir(start: Optional[Path] = None) -> Optional[Path]:
@@ -49,7 +84,10 @@ def find_base_dir(start: Optional[Path] = None) -> Optional[Path]:
     Returns the directory containing the config, or ``None`` if not found.
     """
     current = start or Path.cwd()
+    if current in _NO_BASE_DIR:
+        return None
     for path in [current, *current.parents]:
         if (path / CONFIG_FILENAME).exists():
             return path
+    _NO_BASE_DIR.add(current)
     return None
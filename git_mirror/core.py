@@ -12,50 +12,71 @@ Examples:
 
 Notes:
 - All path segments after the host are preserved.
-- Clones use `--mirror`. Existing mirrors are updated with `git remote update --prune`.
+- Clones use `--mirror`. Existing mirrors are updated with `git fetch --prune --all`.
 """
 
 from __future__ import annotations
+import functools
 import os
 import re
+import shutil
+import stat
 import subprocess
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Iterator, Optional, Tuple, List
+from typing import Dict, Iterator, Optional, Set, Tuple, List, Union
 from urllib.parse import urlparse
-from datetime import datetime
+from datetime import datetime, timezone
 
 SSH_SCHEME_RE = re.compile(r"""
-    ^(?P<user>[A-Za-z0-9._-]+)@(?P<host>[A-Za-z0-9._-]+):
-    (?P<path>.+)$
+    (?P<user>[A-Za-z0-9._-]+)@(?P<host>[A-Za-z0-9._-]+):
+    (?P<path>.+)
 """, re.VERBOSE)
 
+# Fetches are network-bound subprocesses, so oversubscribe the CPU count.
+DEFAULT_JOBS = min(32, (os.cpu_count() or 4) * 4)
+
 
 @dataclass(frozen=True)
 class RepoID:
     host: str
     path: Tuple[str, ...]  # path components after the host, repo name last
+    # Relative location as a /-path and on disk, derived in __post_init__.
+    # RepoIDs of remote URLs are cached by parse_repo_id, so repeated URLs
+    # reuse both.
+    rel_path: str = field(init=False, repr=False, compare=False)
+    _suffix: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.path:
+            raise ValueError(f"RepoID for {self.host!r} needs at least a repository name")
+        rel = f"{self.host}/{'/'.join(self.path)}.git"
+        object.__setattr__(self, "rel_path", rel)
+        object.__setattr__(self, "_suffix", rel if os.sep == "/" else rel.replace("/", os.sep))
 
     @property
     def owner(self) -> str:
-        return self.path[0] if self.path else ""
+        return self.path[0]
 
     @property
     def name(self) -> str:
-        return self.path[-1] if self.path else ""
+        return self.path[-1]
 
     def mirror_dir(self, base_dir: Path) -> Path:
         """Return the on-disk path for this repository under ``base_dir``."""
-        return base_dir.joinpath(self.host, *self.path[:-1], f"{self.path[-1]}.git")
+        return base_dir / self._suffix
 
 
 def _strip_git_suffix(repo: str) -> str:
-    return repo[:-4] if repo.endswith(".git") else repo
+    return repo[:-4] if repo[-4:] == ".git" else repo
 
 
 def _parse_ssh_like(url: str) -> Optional[Tuple[str, str]]:
     """Parse ``git@host:path`` style URLs into ``(host, path)``."""
-    m = SSH_SCHEME_RE.match(url)
+    # Like the old ``^...$`` match, accept one trailing newline
+    m = SSH_SCHEME_RE.fullmatch(url[:-1] if url.endswith("\n") else url)
     if not m:
         return None
     return m.group("host"), m.group("path")
@@ -63,7 +84,7 @@ def _parse_ssh_like(url: str) -> Optional[Tuple[str, str]]:
 
 def _split_path(path: str) -> Tuple[str, ...]:
     """Split a repository path into components and drop any trailing ``.git``."""
-    parts = [p for p in Path(path).parts if p not in ("/", "")]
+    parts = [p for p in path.strip("/").split("/") if p and p != "."]
     if not parts:
         raise ValueError(f"Cannot parse path from empty string: {path}")
     parts[-1] = _strip_git_suffix(parts[-1])
@@ -72,15 +93,26 @@ def _split_path(path: str) -> Tuple[str, ...]:
     return tuple(parts)
 
 
-def parse_repo_id(url: str) -> RepoID:
-    """Parse a Git URL (SSH/HTTP/etc.) into ``RepoID(host, path)``."""
+@functools.lru_cache(maxsize=4096)
+def _parse_remote_url(url: str) -> Optional[RepoID]:
+    """Parse SSH/HTTP-style URLs; ``None`` if ``url`` has no remote scheme."""
     # SSH style: git@host:path
     ssh = _parse_ssh_like(url)
     if ssh is not None:
         host, path = ssh
         return RepoID(host=host, path=_split_path(path))
 
-    # HTTP(S) style
+    # Plain http(s)://[user@]host[:port]/path: split by hand, no urlparse
+    if url.startswith(("https://", "http://")):
+        netloc, _, path = url.partition("://")[2].partition("/")
+        # urlparse drops tab/CR/LF anywhere in the URL; leave those to it
+        if not any(c in url for c in "?#[\t\r\n"):
+            host = netloc.rpartition("@")[2].partition(":")[0].lower()
+            if not host:
+                raise ValueError(f"Missing host in URL: {url}")
+            return RepoID(host=host, path=_split_path(path))
+
+    # Other schemes, or URLs with query/fragment/IPv6 hosts
     parsed = urlparse(url)
     if parsed.scheme in ("http", "https", "ssh", "git"):
         host = parsed.hostname or ""
@@ -88,6 +120,15 @@ def parse_repo_id(url: str) -> RepoID:
             raise ValueError(f"Missing host in URL: {url}")
         # parsed.path starts with '/', remove it for clean splitting
         return RepoID(host=host, path=_split_path(parsed.path.lstrip("/")))
+    return None
+
+
+def parse_repo_id(url: str) -> RepoID:
+    """Parse a Git URL (SSH/HTTP/etc.) into ``RepoID(host, path)``."""
+    # Remote URLs are pure string parsing and repeat across runs, so cache them
+    rid = _parse_remote_url(url)
+    if rid is not None:
+        return rid
 
     # Local path fallback (less common for your use case, but harmless)
     if os.path.exists(url):
@@ -102,22 +143,149 @@ def parse_repo_id(url: str) -> RepoID:
     raise ValueError(f"Unsupported URL format: {url}")
 
 
-def _run(cmd: List[str], cwd: Optional[Path] = None, check: bool = True) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        cmd,
-        cwd=str(cwd) if cwd else None,
-        check=check,
-        stdout=subprocess.PIPE,
+@functools.lru_cache(maxsize=None)
+def _executable(name: str) -> str:
+    """Absolute path of *name* on PATH, or *name* itself if it is not found."""
+    return shutil.which(name) or name
+
+
+def _spawn_argv(cmd: List[str], cwd: Optional[Path]) -> Tuple[List[str], Optional[str]]:
+    """
+    Return ``(argv, cwd)`` for ``subprocess`` such that it can use posix_spawn.
+
+    CPython only takes the posix_spawn path for an absolute executable, no
+    ``cwd`` and ``close_fds=False``; git commands are therefore given their
+    working directory through ``git -C`` instead.
+    """
+    argv = [_executable(cmd[0]), *map(os.fspath, cmd[1:])]
+    if cwd is None:
+        return argv, None
+    if cmd[0] == "git":
+        argv[1:1] = ["-C", os.fspath(cwd)]
+        return argv, None
+    return argv, os.fspath(cwd)
+
+
+def _run(
+    cmd: List[str],
+    cwd: Optional[Path] = None,
+    check: bool = True,
+    *,
+    capture: bool = False,
+    stdin_text: Optional[str] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run ``cmd``; with ``capture`` both streams are returned as text and
+    ``stdin_text``, if given, is fed to the command.
+
+    Without ``capture`` stdout is discarded and stderr is read as raw bytes,
+    so progress output of large fetches is never decoded. stderr is only
+    decoded when the command fails, for the ``CalledProcessError`` message.
+
+    File descriptors are not closed in the child: Python opens them
+    non-inheritable anyway, and keeping ``close_fds=False`` lets the spawn
+    skip the fork + fd sweep.
+    """
+    argv, cwd_arg = _spawn_argv(cmd, cwd)
+    if capture:
+        cp = subprocess.run(
+            argv,
+            cwd=cwd_arg,
+            close_fds=False,
+            input=stdin_text,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if check and cp.returncode != 0:
+            raise subprocess.CalledProcessError(
+                cp.returncode, cmd, output=cp.stdout, stderr=cp.stderr
+            )
+        return cp
+    cp = subprocess.run(
+        argv,
+        cwd=cwd_arg,
+        close_fds=False,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
-        text=True,
     )
+    if check and cp.returncode != 0:
+        raise subprocess.CalledProcessError(
+            cp.returncode, cmd, stderr=cp.stderr.decode("utf-8", "replace")
+        )
+    return cp
+
+
+def _shares_history(repo_dir: Path, oids: List[str]) -> bool:
+    """Whether any of ``oids`` is present in ``repo_dir``'s object store."""
+    cp = _run(
+        ["git", "cat-file", "--batch-check"],
+        cwd=repo_dir,
+        check=False,
+        capture=True,
+        stdin_text="".join(f"{oid}\n" for oid in oids),
+    )
+    return cp.returncode == 0 and any(
+        not line.endswith(" missing") for line in cp.stdout.splitlines()
+    )
+
+
+def find_fork_reference(url: str, base_dir: Path) -> Optional[Path]:
+    """
+    Return an existing mirror that ``url`` is a fork of, if any.
+
+    Candidates are mirrors on the same host whose path differs only in the
+    owner segment (``github.com/<other>/<name>.git``). A candidate is only
+    used if it already has one of the commits or tags ``url`` advertises
+    (one ``git ls-remote``), so unrelated repositories that merely share a
+    name are never linked. ``None`` if no candidate qualifies.
+    """
+    rid = parse_repo_id(url)
+    if len(rid.path) < 2:
+        return None
+    target = rid.mirror_dir(base_dir)
+    host_dir = base_dir / rid.host
+    rest = os.path.join(*rid.path[1:-1], f"{rid.name}.git")
+    try:
+        owners = sorted(e.name for e in os.scandir(host_dir) if e.is_dir())
+    except OSError:
+        return None
+    candidates = [host_dir / owner / rest for owner in owners]
+    candidates = [c for c in candidates if c != target and is_git_mirror_dir(c)]
+    if not candidates:
+        return None
+    remote = _run(["git", "ls-remote", url], check=False, capture=True)
+    oids = sorted({oid for oid, _ in _ref_pairs(remote.stdout)}) if remote.returncode == 0 else []
+    if not oids:
+        return None
+    for candidate in candidates:
+        if _shares_history(candidate, oids):
+            return candidate
+    return None
 
 
-def ensure_mirror(url: str, base_dir: Path) -> Path:
+def ensure_mirror(
+    url: str,
+    base_dir: Path,
+    *,
+    filter_spec: Optional[str] = None,
+    reference: Optional[Path] = None,
+) -> Path:
     """
     Ensure a repository is mirror-cloned under ``base_dir`` in
     ``host/<path>.git``. If already present, do a remote update; otherwise
     perform ``git clone --mirror``. Returns the path to the mirror directory.
+
+    ``filter_spec`` (e.g. ``blob:none``) makes a new mirror a partial clone.
+    Git records the filter in the mirror's config and reuses it for every
+    later fetch, so it only needs to be given on the first clone.
+
+    ``reference`` names another mirror to copy objects from when cloning a
+    new mirror, so shared history is not downloaded again. The clone uses
+    ``--reference-if-able`` with ``--dissociate``: the new mirror ends up
+    with its own copy of every object and does not depend on the reference,
+    which stays free to be fetched, pruned or deleted. It is ignored for
+    existing mirrors.
     """
     rid = parse_repo_id(url)
     target = rid.mirror_dir(base_dir)
@@ -126,72 +294,244 @@ def ensure_mirror(url: str, base_dir: Path) -> Path:
 
     if target.exists():
         # Update existing mirror
-        _run(["git", "remote", "update", "--prune"], cwd=target)
+        fetch_mirror(target)
     else:
-        _run(["git", "clone", "--mirror", url, str(target)])
+        cmd = ["git", "clone", "--mirror"]
+        if filter_spec:
+            cmd.append(f"--filter={filter_spec}")
+        if reference is not None:
+            cmd += ["--reference-if-able", str(reference), "--dissociate"]
+        _run([*cmd, url, str(target)])
 
     return target
 
 
-def is_git_mirror_dir(path: Path) -> bool:
+def is_git_mirror_dir(path: Union[Path, os.DirEntry]) -> bool:
     """
     Heuristic to detect a mirror dir: ends with .git and has typical files.
+
+    ``path`` may be an ``os.DirEntry`` from a scandir walk, in which case the
+    directory check reuses the entry's cached type instead of a stat.
     """
-    return (
-        path.is_dir()
-        and path.name.endswith(".git")
-        and (path / "config").exists()
-        and (path / "HEAD").exists()
-    )
+    if isinstance(path, os.DirEntry):
+        if not path.is_dir():
+            return False
+        top = path.path
+    else:
+        top = os.fspath(path)
+        try:
+            if not stat.S_ISDIR(os.stat(top).st_mode):
+                return False
+        except OSError:
+            return False
+    if not top.endswith(".git"):
+        return False
+    # Short-circuit: HEAD is only probed once config is known to exist
+    try:
+        os.lstat(os.path.join(top, "config"))
+        os.lstat(os.path.join(top, "HEAD"))
+    except OSError:
+        return False
+    return True
 
 
 def iter_mirrored_repos(base_dir: Path) -> Iterator[Path]:
     """
     Yield all mirror directories under base_dir recursively.
+
+    The walk never descends into ``*.git`` directories, so the objects/refs
+    trees inside each mirror are not listed. Symlinked directories are not
+    followed, so an alias of a mirror is never yielded in place of the real
+    one, and each directory (by device/inode) is visited at most once.
     """
-    if not base_dir.exists():
+    stack = [os.fspath(base_dir)]
+    seen: Set[Tuple[int, int]] = set()
+    try:
+        root = os.stat(stack[0])
+    except OSError:
         return
-    for p in base_dir.rglob("*.git"):
-        if is_git_mirror_dir(p):
-            yield p
+    seen.add((root.st_dev, root.st_ino))
+    while stack:
+        top = stack.pop()
+        try:
+            it = os.scandir(top)
+        except OSError:
+            continue
+        candidates: List[os.DirEntry] = []
+        with it:
+            for entry in it:
+                try:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if entry.name.endswith(".git"):
+                    candidates.append(entry)
+                else:
+                    stack.append(entry.path)
+        for entry in candidates:
+            if is_git_mirror_dir(entry):
+                yield Path(entry.path)
+
+
+def iter_mirrored_repos_with_rel(base_dir: Path) -> Iterator[Tuple[Path, str]]:
+    """
+    Yield ``(mirror_dir, rel)`` for every mirror under ``base_dir``, where
+    ``rel`` is the mirror's path relative to ``base_dir`` with ``/``
+    separators, sliced from the walked path without any extra syscalls.
+    """
+    skip = len(os.fspath(base_dir))
+    for repo in iter_mirrored_repos(base_dir):
+        rel = os.fspath(repo)[skip:].lstrip(os.sep)
+        yield repo, rel if os.sep == "/" else rel.replace(os.sep, "/")
 
 
 def fetch_mirror(repo_dir: Path) -> None:
     """
     Fetch updates for a single mirror repository.
+
+    Runs ``git fetch`` directly rather than ``git remote update``, which only
+    re-executes ``git fetch`` in a child process.
+    """
+    _run(["git", "fetch", "--prune", "--all"], cwd=repo_dir)
+
+
+def _ref_pairs(lines: str) -> Set[Tuple[str, str]]:
+    """Parse ``<oid>\t<ref>`` lines, skipping HEAD and peeled tag entries."""
+    pairs = set()
+    for line in lines.splitlines():
+        oid, _, ref = line.partition("\t")
+        if ref.startswith("refs/") and not ref.endswith("^{}"):
+            pairs.add((oid, ref))
+    return pairs
+
+
+def is_update_needed(repo_dir: Path, remote: str = "origin") -> bool:
+    """
+    Return ``False`` if the refs advertised by ``remote`` already match the
+    mirror's local refs, so a fetch would be a no-op.
+
+    Only ref names and object ids are transferred. Any failure to list the
+    remote is treated as "update needed" so the fetch reports the error.
     """
-    _run(["git", "remote", "update", "--prune"], cwd=repo_dir)
+    try:
+        remote_refs = _run(
+            ["git", "ls-remote", remote], cwd=repo_dir, capture=True
+        ).stdout
+    except subprocess.CalledProcessError:
+        return True
+    local_refs = _run(
+        ["git", "for-each-ref", "--format=%(objectname)%09%(refname)"],
+        cwd=repo_dir,
+        capture=True,
+    ).stdout
+    return _ref_pairs(remote_refs) != _ref_pairs(local_refs)
+
+
+def _update_mirror(repo_dir: Path, skip_unchanged: bool) -> None:
+    if skip_unchanged and not is_update_needed(repo_dir):
+        return
+    fetch_mirror(repo_dir)
 
 
-def fetch_all(base_dir: Path) -> List[Tuple[Path, Optional[str]]]:
+def fetch_all(
+    base_dir: Path,
+    jobs: int = DEFAULT_JOBS,
+    *,
+    skip_unchanged: bool = False,
+) -> Iterator[Tuple[Path, Optional[str]]]:
     """
-    Iterate all mirrored repos under base_dir and fetch updates.
-    Returns a list of tuples: (repo_path, error_message_or_None).
+    Iterate all mirrored repos under base_dir and fetch updates, running up
+    to ``jobs`` fetches concurrently.
+    Yields tuples (repo_path, error_message_or_None) as each fetch completes.
+    Only a bounded window of fetches is queued at a time, so memory use does
+    not grow with the number of mirrors.
+
+    With ``skip_unchanged`` each worker first compares ``git ls-remote``
+    against the local refs (see :func:`is_update_needed`) and skips the fetch
+    when they match.
     """
-    results: List[Tuple[Path, Optional[str]]] = []
-    for repo in iter_mirrored_repos(base_dir):
+    jobs = max(1, jobs)
+    work = functools.partial(_update_mirror, skip_unchanged=skip_unchanged)
+    repos = iter_mirrored_repos(base_dir)
+    pending: Dict[Future, Path] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
         try:
-            fetch_mirror(repo)
-            results.append((repo, None))
-        except subprocess.CalledProcessError as e:
-            # Capture stderr for diagnostics, but keep going
-            err = e.stderr.strip() if e.stderr else str(e)
-            results.append((repo, err))
-    return results
+            for repo in islice(repos, 2 * jobs):
+                pending[pool.submit(work, repo)] = repo
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    repo = pending.pop(fut)
+                    for nxt in islice(repos, 1):
+                        pending[pool.submit(work, nxt)] = nxt
+                    try:
+                        fut.result()
+                    except subprocess.CalledProcessError as e:
+                        # Capture stderr for diagnostics, but keep going
+                        yield repo, (e.stderr.strip() if e.stderr else str(e))
+                    else:
+                        yield repo, None
+        finally:
+            # Closing the generator early drops fetches that have not started
+            for fut in pending:
+                fut.cancel()
 
 
 SYNC_MARKER = ".last_sync"
 
+# Sync times keyed by marker path, validated against the file's (inode, mtime).
+_SYNC_CACHE: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
 
 def record_sync_time(base_dir: Path) -> None:
-    base_dir = base_dir.resolve()
-    base_dir.mkdir(parents=True, exist_ok=True)
-    marker = base_dir / SYNC_MARKER
-    marker.write_text(datetime.utcnow().isoformat() + "\n", encoding="utf-8")
+    """
+    Write the current UTC time to ``base_dir/.last_sync``.
+
+    The timestamp goes to a per-process temporary file that is then renamed
+    over the marker, so concurrent readers never see a partial write.
+    """
+    if not base_dir.is_absolute():
+        base_dir = base_dir.resolve()
+    marker = os.fspath(base_dir / SYNC_MARKER)
+    tmp = f"{marker}.{os.getpid()}.tmp"
+    data = (datetime.now(timezone.utc).isoformat() + "\n").encode("utf-8")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+    try:
+        fd = os.open(tmp, flags, 0o644)
+    except FileNotFoundError:
+        base_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(tmp, flags, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp, marker)
 
 
 def read_sync_time(base_dir: Path) -> Optional[str]:
-    marker = base_dir / SYNC_MARKER
-    if marker.exists():
-        return marker.read_text(encoding="utf-8").strip()
-    return None
+    """
+    Return the timestamp stored by :func:`record_sync_time`, or ``None``.
+
+    The value is cached until the marker is replaced, so repeated reads only
+    cost a stat.
+    """
+    marker = os.fspath(base_dir / SYNC_MARKER)
+    try:
+        st = os.stat(marker)
+    except FileNotFoundError:
+        _SYNC_CACHE.pop(marker, None)
+        return None
+    key = (st.st_ino, st.st_mtime_ns)
+    cached = _SYNC_CACHE.get(marker)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(marker, encoding="utf-8") as fh:
+        value = fh.read().strip()
+    _SYNC_CACHE[marker] = (key, value)
+    return value
@@ -22,25 +22,20 @@ You can build the repo path from a URL with git_mirror.core.parse_repo_id + gito
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
 import subprocess
-import re
-from typing import Optional, List, Tuple, Dict, Any, Set
+import threading
+from typing import Optional, List, Tuple, Dict, Any, FrozenSet, Iterable
 import os
 
-from .core import RepoID, parse_repo_id, iter_mirrored_repos, read_sync_time
+from .core import RepoID, parse_repo_id, iter_mirrored_repos_with_rel, read_sync_time, _run
 
 
 def _run_git(args, cwd: Path) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["git", *args],
-        cwd=str(cwd),
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    return _run(["git", *args], cwd=cwd, capture=True)
 
 
 def ensure_admin_repo(admin_url: str, admin_dir: Path) -> Path:
@@ -50,22 +45,45 @@ def ensure_admin_repo(admin_url: str, admin_dir: Path) -> Path:
     Returns the path.
     """
     admin_dir = admin_dir.resolve()
+    head = None
     if not admin_dir.exists():
         admin_dir.parent.mkdir(parents=True, exist_ok=True)
         _run_git(["clone", admin_url, str(admin_dir)], cwd=admin_dir.parent)
-    # Refresh
-    _run_git(["fetch", "--prune", "origin"], cwd=admin_dir)
-    # Try both master and main because the world is inconsistent
+        # The clone already checked out the remote's default branch
+        head = _checked_out_branch(admin_dir)
+        if head == "master":
+            return admin_dir
+    else:
+        # Refresh (a fresh clone is already up to date)
+        _run_git(["fetch", "--prune", "origin"], cwd=admin_dir)
+    # Try both master and main because the world is inconsistent; one
+    # for-each-ref lists whichever exist instead of a rev-parse per branch
+    remote_branches = _run_git(
+        [
+            "for-each-ref",
+            "--format=%(refname:strip=3)",
+            "refs/remotes/origin/master",
+            "refs/remotes/origin/main",
+        ],
+        cwd=admin_dir,
+    ).stdout.split()
     for branch in ("master", "main"):
-        try:
-            _run_git(["rev-parse", "--verify", f"origin/{branch}"], cwd=admin_dir)
-            _run_git(["checkout", "-B", branch, f"origin/{branch}"], cwd=admin_dir)
+        if branch in remote_branches:
+            if branch != head:
+                _run_git(["checkout", "-B", branch, f"origin/{branch}"], cwd=admin_dir)
             break
-        except subprocess.CalledProcessError:
-            continue
     return admin_dir
 
 
+def _checked_out_branch(repo_dir: Path) -> Optional[str]:
+    """Branch named by .git/HEAD, read without running git."""
+    try:
+        head = (repo_dir / ".git" / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return head[len("ref: refs/heads/"):] if head.startswith("ref: refs/heads/") else None
+
+
 def ensure_include_of_mirrors_conf(admin_dir: Path, include_file: str = "mirrors.conf") -> Path:
     """
     Ensure conf/gitolite.conf includes `include "<include_file>"`.
@@ -100,7 +118,7 @@ def gitolite_path_for(rid: RepoID, prefix: str = "mirrors") -> str:
     Build the Gitolite-visible path for a mirror (matches on-disk layout).
     Example: mirrors/github.com/psf/requests.git or mirrors/gitlab.com/group/sub/repo.git
     """
-    return f"{prefix}/{rid.host}/{'/'.join(rid.path)}.git"
+    return f"{prefix}/{rid.rel_path}"
 
 
 @dataclass
@@ -110,67 +128,132 @@ class UpsertResult:
     file: Path
 
 
-_STANZA_HEADER_RE = re.compile(r'^\s*repo\s+(.+?)\s*$', re.IGNORECASE)
-_READER_LINE_RE = re.compile(r'^\s*R\s*=\s*(.+?)\s*$', re.IGNORECASE)
+@dataclass
+class MirrorsConfIndex:
+    """
+    A parsed mirrors.conf: the file's bytes and its stanzas' byte ranges.
 
+    ``data`` has CRLF line endings normalised and always ends in a newline.
+    ``stamp`` is the ``(mtime_ns, size)`` of the file it was read from.
+    """
 
-def upsert_mirror_repo(
-    admin_dir: Path,
-    repo_path: str,
-    readers: str = "@all",
-    mirrors_conf_file: str = "mirrors.conf",
-) -> UpsertResult:
+    path: Path
+    stamp: Tuple[int, int]
+    data: bytes
+    stanzas: List[Tuple[str, int, int]]
+    repos: FrozenSet[str]
+    _line_spans: Optional[Dict[str, Tuple[int, int]]] = field(default=None, repr=False)
+
+    def line_spans(self) -> Dict[str, Tuple[int, int]]:
+        """Map each repo to its ``[start, end)`` line range (computed once)."""
+        if self._line_spans is None:
+            pos: Dict[str, Tuple[int, int]] = {}
+            line = offset = 0
+            for repo, start, end in self.stanzas:
+                line += self.data.count(b"\n", offset, start)
+                offset = end
+                last = line + self.data.count(b"\n", start, end)
+                pos[repo] = (line, last)
+                line = last
+            self._line_spans = pos
+        return self._line_spans
+
+
+# Parsed mirrors.conf files keyed by path, validated against (mtime, size).
+_PARSE_CACHE: Dict[Path, MirrorsConfIndex] = {}
+_PARSE_LOCK = threading.Lock()
+
+
+def _read_conf_bytes(path: Path) -> bytes:
+    """Read *path* undecoded, with universal newlines like ``read_text``."""
+    data = path.read_bytes()
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return data
+
+
+def _split_stanzas(data: bytes) -> List[Tuple[str, int, int]]:
     """
-    Ensure a read-only stanza for `repo_path` exists in conf/<mirrors_conf_file>.
-    Returns UpsertResult(changed=bool).
+    Return ``(repo, start, end)`` byte ranges of the stanzas in *data*.
+
+    Headers are ``repo <name>`` lines (any case, optionally indented),
+    matched with plain byte slicing rather than a regex; a stanza runs until
+    the next header or the end of the file.
     """
-    mirrors_conf = admin_dir / "conf" / mirrors_conf_file
-    if not mirrors_conf.exists():
-        raise FileNotFoundError(f"{mirrors_conf} does not exist; call ensure_include_of_mirrors_conf first.")
+    headers: List[Tuple[str, int]] = []
+    offset = 0
+    for line in data.split(b"\n"):
+        stripped = line.lstrip(b" \t")
+        if stripped[:4].lower() == b"repo" and stripped[4:5] in (b" ", b"\t"):
+            repo = stripped[5:].strip()
+            if repo:
+                headers.append((repo.decode("utf-8"), offset))
+        offset += len(line) + 1
+    ends = [start for _, start in headers[1:]] + [len(data)]
+    return [(repo, start, end) for (repo, start), end in zip(headers, ends)]
+
+
+def load_mirrors_conf_index(admin_dir: Path, mirrors_conf_file: str = "mirrors.conf") -> MirrorsConfIndex:
+    """
+    Return the parsed conf/<mirrors_conf_file>.
 
-    content = mirrors_conf.read_text(encoding="utf-8").splitlines()
-
-    # Find existing stanza indices if present
-    i = 0
-    start_idx = end_idx = None
-    while i < len(content):
-        m = _STANZA_HEADER_RE.match(content[i])
-        if m:
-            current_repo = m.group(1).strip()
-            # stanza ends before next 'repo ' header or file end
-            j = i + 1
-            while j < len(content) and not _STANZA_HEADER_RE.match(content[j]):
-                j += 1
-            if current_repo == repo_path:
-                start_idx, end_idx = i, j
-                break
-            i = j
-        else:
-            i += 1
+    The index is cached until the file's mtime or size changes, so repeated
+    calls only cost a stat; it is shared and must not be modified.
+    """
+    mirrors_conf = _mirrors_conf_path(admin_dir, mirrors_conf_file)
+    st = mirrors_conf.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _PARSE_LOCK:
+        cached = _PARSE_CACHE.get(mirrors_conf)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    data = _read_conf_bytes(mirrors_conf)
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+    return _store_index(mirrors_conf, stamp, data)
+
+
+def _store_index(mirrors_conf: Path, stamp: Tuple[int, int], data: bytes) -> MirrorsConfIndex:
+    """Parse *data* (normalised file contents) and cache it under *stamp*."""
+    stanzas = _split_stanzas(data)
+    index = MirrorsConfIndex(
+        path=mirrors_conf,
+        stamp=stamp,
+        data=data,
+        stanzas=stanzas,
+        repos=frozenset(repo for repo, _, _ in stanzas),
+    )
+    with _PARSE_LOCK:
+        _PARSE_CACHE[mirrors_conf] = index
+    return index
 
-    desired = [
-        f"repo {repo_path}",
-        f"    R   = {readers}",
-        "    RW+ =",
-        "",
-    ]
-
-    if start_idx is None:
-        # Append new stanza
-        if content and content[-1].strip() != "":
-            content.append("")  # ensure blank line before new stanza
-        content.extend(desired)
-        mirrors_conf.write_text("\n".join(content) + "\n", encoding="utf-8")
-        return UpsertResult(path=repo_path, changed=True, file=mirrors_conf)
-
-    # Update existing stanza minimally: ensure readers line is correct and RW+ is empty
-    stanza = content[start_idx:end_idx]
+
+def _restamp(mirrors_conf: Path, data: bytes) -> None:
+    """Cache *data* as the contents just written to *mirrors_conf*."""
+    st = mirrors_conf.stat()
+    _store_index(mirrors_conf, (st.st_mtime_ns, st.st_size), data)
+
+
+def _is_reader_line(line: str) -> bool:
+    """Whether *line* is an ``R = <readers>`` rule (any case and spacing)."""
+    stripped = line.lstrip()
+    if stripped[:1] not in ("R", "r"):
+        return False
+    rest = stripped[1:].lstrip()
+    return rest[:1] == "=" and len(rest) > 1
+
+
+def _conform_stanza(stanza: List[str], readers: str) -> bool:
+    """
+    Update *stanza* in place so readers get ``R`` and nobody gets ``RW+``.
+    Returns whether the R line had to be changed or either line added.
+    """
     updated = False
 
     # Ensure R line
     has_r = False
     for k, line in enumerate(stanza):
-        if _READER_LINE_RE.match(line):
+        if _is_reader_line(line):
             has_r = True
             new_line = f"    R   = {readers}"
             if line.strip() != new_line.strip():
@@ -186,17 +269,103 @@ def upsert_mirror_repo(
         stanza.insert(2, "    RW+ =")
         updated = True
     else:
-        stanza = [
+        stanza[:] = [
             ("    RW+ =" if l.strip().lower().startswith("rw+") else l)
             for l in stanza
         ]
+    return updated
 
-    if updated:
-        # write back merged content
-        content = content[:start_idx] + stanza + content[end_idx:]
-        mirrors_conf.write_text("\n".join(content) + "\n", encoding="utf-8")
 
-    return UpsertResult(path=repo_path, changed=updated, file=mirrors_conf)
+def upsert_mirror_repos_bulk(
+    admin_dir: Path,
+    repo_paths: Iterable[str],
+    readers: str = "@all",
+    mirrors_conf_file: str = "mirrors.conf",
+    *,
+    remove: Iterable[str] = (),
+    index: Optional[MirrorsConfIndex] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Ensure read-only stanzas for all of `repo_paths` exist in
+    conf/<mirrors_conf_file> and drop the stanzas listed in `remove`.
+
+    The file is rebuilt in a single pass and written at most once; when the
+    only change is new stanzas they are appended instead. `index`
+    may be passed when the caller already loaded the file with
+    load_mirrors_conf_index(). Returns (changed_paths, removed_paths); new
+    stanzas count as changed.
+    """
+    mirrors_conf = admin_dir / "conf" / mirrors_conf_file
+    if not mirrors_conf.exists():
+        raise FileNotFoundError(f"{mirrors_conf} does not exist; call ensure_include_of_mirrors_conf first.")
+
+    if index is None:
+        index = load_mirrors_conf_index(admin_dir, mirrors_conf_file)
+    data, stanzas = index.data, index.stanzas
+    pending = dict.fromkeys(repo_paths)
+    drop = set(remove)
+    # Text before the first stanza (comments) is kept as is; kept stanzas
+    # are spliced in as byte slices and only edited ones are decoded
+    out = bytearray(data[: stanzas[0][1]] if stanzas else data)
+    changed: List[str] = []
+    removed: List[str] = []
+
+    for repo, start, end in stanzas:
+        if repo in drop:
+            removed.append(repo)
+            continue
+        if repo in pending:
+            # Update existing stanza minimally (first occurrence only)
+            del pending[repo]
+            stanza = data[start:end - 1].decode("utf-8").split("\n")
+            if _conform_stanza(stanza, readers):
+                changed.append(repo)
+                out += ("\n".join(stanza) + "\n").encode("utf-8")
+                continue
+        out += data[start:end]
+
+    # Existing content untouched: new stanzas can be appended to the file
+    append_only = not changed and not removed
+    keep = len(out)
+
+    # Append new stanzas
+    for repo in pending:
+        last_line = out[out.rfind(b"\n", 0, len(out) - 1) + 1:]
+        if out and last_line.strip():
+            out += b"\n"  # ensure blank line before new stanza
+        out += f"repo {repo}\n    R   = {readers}\n    RW+ =\n\n".encode("utf-8")
+        changed.append(repo)
+
+    if append_only and changed:
+        with mirrors_conf.open("r+b") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            if size:
+                fh.seek(size - 1)
+                if fh.read(1) != b"\n":
+                    fh.write(b"\n")  # terminate the unterminated last line
+            fh.write(bytes(out[keep:]))
+        _restamp(mirrors_conf, bytes(out))
+    elif changed or removed:
+        mirrors_conf.write_bytes(bytes(out))
+        _restamp(mirrors_conf, bytes(out))
+    return changed, removed
+
+
+def upsert_mirror_repo(
+    admin_dir: Path,
+    repo_path: str,
+    readers: str = "@all",
+    mirrors_conf_file: str = "mirrors.conf",
+) -> UpsertResult:
+    """
+    Ensure a read-only stanza for `repo_path` exists in conf/<mirrors_conf_file>.
+    Returns UpsertResult(changed=bool).
+    """
+    changed, _ = upsert_mirror_repos_bulk(
+        admin_dir, [repo_path], readers=readers, mirrors_conf_file=mirrors_conf_file
+    )
+    mirrors_conf = admin_dir / "conf" / mirrors_conf_file
+    return UpsertResult(path=repo_path, changed=bool(changed), file=mirrors_conf)
 
 
 def commit_and_push(admin_dir: Path, message: str) -> None:
@@ -216,6 +385,66 @@ def commit_and_push(admin_dir: Path, message: str) -> None:
     _run_git(["push", "origin", "HEAD"], cwd=admin_dir)
 
 
+class GitoliteBatch:
+    """
+    Context manager that adds many mirrors to gitolite-admin in one go.
+
+        with GitoliteBatch(admin_url, admin_dir) as batch:
+            batch.add("https://github.com/psf/requests.git")
+            batch.add("git@github.com:torvalds/linux.git")
+
+    gitolite-admin is refreshed once on entry, so parse the URLs before
+    entering if a bad one should not cost a fetch. On a clean exit
+    mirrors.conf is updated in a single write and, if anything changed,
+    committed and pushed once. Per-URL outcomes are available from `results`
+    afterwards. Nothing is written if the block raises.
+    """
+
+    def __init__(
+        self,
+        admin_url: str,
+        admin_dir: Path,
+        *,
+        readers: str = "@all",
+        prefix: str = "mirrors",
+        mirrors_conf_file: str = "mirrors.conf",
+    ) -> None:
+        self.admin_url = admin_url
+        self.admin_dir = admin_dir
+        self.readers = readers
+        self.prefix = prefix
+        self.mirrors_conf_file = mirrors_conf_file
+        self.results: List[UpsertResult] = []
+        self._paths: Dict[str, None] = {}
+
+    def __enter__(self) -> "GitoliteBatch":
+        ensure_admin_repo(self.admin_url, self.admin_dir)
+        ensure_include_of_mirrors_conf(self.admin_dir, include_file=self.mirrors_conf_file)
+        return self
+
+    def add(self, url: str) -> str:
+        """Queue the mirror of `url`; returns its gitolite path."""
+        repo_path = gitolite_path_for(parse_repo_id(url), prefix=self.prefix)
+        self._paths[repo_path] = None
+        return repo_path
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            return
+        changed, _ = upsert_mirror_repos_bulk(
+            self.admin_dir, self._paths, readers=self.readers, mirrors_conf_file=self.mirrors_conf_file
+        )
+        mirrors_conf = self.admin_dir / "conf" / self.mirrors_conf_file
+        done = set(changed)
+        self.results = [
+            UpsertResult(path=path, changed=path in done, file=mirrors_conf) for path in self._paths
+        ]
+        if len(changed) == 1:
+            commit_and_push(self.admin_dir, f"Add mirror: {changed[0]}")
+        elif changed:
+            commit_and_push(self.admin_dir, f"Add {len(changed)} mirrors")
+
+
 def add_url_to_gitolite(
     url: str,
     admin_url: str,
@@ -231,16 +460,16 @@ def add_url_to_gitolite(
     - Ensures include of mirrors.conf
     - Upserts the repo stanza
     - Commits and pushes (only if changes)
-    """
-    rid = parse_repo_id(url)
-    repo_path = gitolite_path_for(rid, prefix=prefix)
 
-    ensure_admin_repo(admin_url, admin_dir)
-    ensure_include_of_mirrors_conf(admin_dir, include_file=mirrors_conf_file)
-    res = upsert_mirror_repo(admin_dir, repo_path, readers=readers, mirrors_conf_file=mirrors_conf_file)
-    if res.changed:
-        commit_and_push(admin_dir, f"Add mirror: {repo_path}")
-    return res
+    Use GitoliteBatch to add several URLs with a single fetch and push.
+    """
+    # Reject a bad URL before gitolite-admin is cloned or fetched
+    parse_repo_id(url)
+    with GitoliteBatch(
+        admin_url, admin_dir, readers=readers, prefix=prefix, mirrors_conf_file=mirrors_conf_file
+    ) as batch:
+        batch.add(url)
+    return batch.results[0]
 
 
 # ---------- helpers to read/write mirrors.conf ----------
@@ -257,24 +486,11 @@ def parse_mirrors_conf(admin_dir: Path, mirrors_conf_file: str = "mirrors.conf")
     Parse conf/<mirrors_conf_file> and return a map:
         repo_path -> (start_index, end_index)
     Indices are line ranges [start, end) for the stanza.
-    """
-    mirrors_conf = _mirrors_conf_path(admin_dir, mirrors_conf_file)
-    lines = mirrors_conf.read_text(encoding="utf-8").splitlines()
-    pos: Dict[str, Tuple[int, int]] = {}
 
-    i = 0
-    while i < len(lines):
-        m = _STANZA_HEADER_RE.match(lines[i])
-        if not m:
-            i += 1
-            continue
-        repo = m.group(1).strip()
-        j = i + 1
-        while j < len(lines) and not _STANZA_HEADER_RE.match(lines[j]):
-            j += 1
-        pos[repo] = (i, j)
-        i = j
-    return pos
+    Results are cached until the file's mtime or size changes, so the
+    returned dict is shared and must not be modified.
+    """
+    return load_mirrors_conf_index(admin_dir, mirrors_conf_file).line_spans()
 
 
 def configured_mirror_paths(admin_dir: Path, mirrors_conf_file: str = "mirrors.conf") -> List[str]:
@@ -292,13 +508,56 @@ def gitolite_path_from_mirror_dir(base_dir: Path, repo_dir: Path, prefix: str =
         repo_dir=/home/git/repositories/mirrors/github.com/psf/requests.git
         -> mirrors/github.com/psf/requests.git
     """
-    base_dir = base_dir.resolve()
-    repo_dir = repo_dir.resolve()
-    rel = repo_dir.relative_to(base_dir)  # raises if not under base_dir
+    return _gitolite_path_from_str(
+        os.path.realpath(base_dir), os.path.realpath(repo_dir), prefix
+    )
+
+
+def _gitolite_path_from_str(base: str, repo: str, prefix: str = "mirrors") -> str:
+    """
+    String-only core of gitolite_path_from_mirror_dir: both paths must
+    already be resolved. No Path objects are built and no syscalls made.
+    """
+    base = base.rstrip(os.sep)
+    if not repo.startswith(base + os.sep):
+        raise ValueError(f"{repo} is not under {base or os.sep}")
+    rel = repo[len(base) + 1:]
+    if os.sep != "/":
+        rel = rel.replace(os.sep, "/")
+    path = f"{prefix.rstrip('/')}/{rel}"
     # Ensure .git suffix is present in the Gitolite path
-    name = rel.name if rel.name.endswith(".git") else f"{rel.name}.git"
-    rel = rel.with_name(name)
-    return str(Path(prefix) / rel)
+    return path if path.endswith(".git") else f"{path}.git"
+
+
+def _sorted_diff(left: List[str], right: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Return (only_in_left, only_in_right) for two sorted, duplicate-free
+    lists, in one merge-style walk; both results stay sorted.
+    """
+    only_left: List[str] = []
+    only_right: List[str] = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a, b = left[i], right[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            only_left.append(a)
+            i += 1
+        else:
+            only_right.append(b)
+            j += 1
+    only_left.extend(left[i:])
+    only_right.extend(right[j:])
+    return only_left, only_right
+
+
+def _load_admin_index(admin_url: str, admin_dir: Path, mirrors_conf_file: str) -> MirrorsConfIndex:
+    """Refresh the admin checkout and return its parsed mirrors.conf."""
+    ensure_admin_repo(admin_url, admin_dir)
+    ensure_include_of_mirrors_conf(admin_dir, include_file=mirrors_conf_file)
+    return load_mirrors_conf_index(admin_dir, mirrors_conf_file)
 
 
 def sync_gitolite_from_disk(
@@ -310,63 +569,45 @@ def sync_gitolite_from_disk(
     prefix: str = "mirrors",
     mirrors_conf_file: str = "mirrors.conf",
     prune: bool = False,
+    parallel: bool = True,
 ) -> Tuple[List[str], List[str]]:
     """
     Ensure every on-disk mirror under base_dir has a corresponding read-only
     entry in gitolite's mirrors.conf. Optionally prune stanzas whose mirrors
     no longer exist on disk.
 
+    With `parallel` the admin repo is refreshed and parsed in a worker thread
+    while the mirrors are walked; mirrors.conf is still written only once,
+    from the calling thread.
+
     Returns (added_paths, pruned_paths).
     """
-    ensure_admin_repo(admin_url, admin_dir)
-    ensure_include_of_mirrors_conf(admin_dir, include_file=mirrors_conf_file)
+    with ThreadPoolExecutor(max_workers=1) if parallel else nullcontext() as pool:
+        if pool is not None:
+            loading = pool.submit(_load_admin_index, admin_url, admin_dir, mirrors_conf_file)
+        disk = sorted(f"{prefix}/{rel}" for _, rel in iter_mirrored_repos_with_rel(base_dir))
+        if pool is not None:
+            index = loading.result()
+        else:
+            index = _load_admin_index(admin_url, admin_dir, mirrors_conf_file)
+
+    to_add, stale = _sorted_diff(disk, sorted(index.repos))
+    to_prune = stale if prune else []
+
+    # Add missing and prune stale stanzas in one rewrite of the parsed file
+    changed, pruned = upsert_mirror_repos_bulk(
+        admin_dir,
+        to_add,
+        readers=readers,
+        mirrors_conf_file=mirrors_conf_file,
+        remove=to_prune,
+        index=index,
+    )
 
-    # Build sets
-    disk_paths: List[str] = []
-    for repo in iter_mirrored_repos(base_dir):
-        try:
-            disk_paths.append(gitolite_path_from_mirror_dir(base_dir, repo, prefix=prefix))
-        except Exception:
-            # Skip anything weird that's not under base_dir
-            continue
-    set_disk = set(disk_paths)
-    set_cfg = set(configured_mirror_paths(admin_dir, mirrors_conf_file))
-
-    to_add = sorted(set_disk - set_cfg)
-    to_prune = sorted(set_cfg - set_disk) if prune else []
-
-    # Add missing
-    changed = False
-    added: List[str] = []
-    for path in to_add:
-        res = upsert_mirror_repo(admin_dir, path, readers=readers, mirrors_conf_file=mirrors_conf_file)
-        if res.changed:
-            changed = True
-        added.append(path)
-
-    # Prune stale stanzas
-    pruned: List[str] = []
-    if to_prune:
-        mirrors_conf = _mirrors_conf_path(admin_dir, mirrors_conf_file)
-        lines = mirrors_conf.read_text(encoding="utf-8").splitlines()
-        spans = parse_mirrors_conf(admin_dir, mirrors_conf_file)
-
-        # Remove from bottom to top so indices stay valid
-        for repo in sorted(to_prune, key=lambda r: spans[r][0], reverse=True):
-            si, sj = spans[repo]
-            del lines[si:sj]
-            # Trim surrounding blank lines
-            while si < len(lines) and lines[si].strip() == "":
-                del lines[si]
-            changed = True
-            pruned.append(repo)
-
-        mirrors_conf.write_text("\n".join(lines) + ("\n" if lines and lines[-1] != "" else ""), encoding="utf-8")
-
-    if changed:
+    if changed or pruned:
         commit_and_push(admin_dir, "Sync mirrors.conf with on-disk mirrors")
 
-    return added, pruned
+    return to_add, pruned
 
 
 def status_report(
@@ -379,27 +620,20 @@ def status_report(
 ) -> Dict[str, Any]:
     """Return a summary of mirror status versus gitolite configuration."""
 
-    disk_paths: List[str] = []
-    bad_layout: List[str] = []
-    for repo in iter_mirrored_repos(base_dir):
-        try:
-            disk_paths.append(
-                gitolite_path_from_mirror_dir(base_dir, repo, prefix=prefix)
-            )
-        except Exception:
-            bad_layout.append(str(repo))
+    disk_paths = [f"{prefix}/{rel}" for _, rel in iter_mirrored_repos_with_rel(base_dir)]
 
-    set_disk = set(disk_paths)
-    set_cfg: Optional[Set[str]] = None
+    missing_in_config: Optional[List[str]] = None
+    missing_on_disk: Optional[List[str]] = None
 
     if admin_url and admin_dir:
-        ensure_admin_repo(admin_url, admin_dir)
-        ensure_include_of_mirrors_conf(admin_dir, include_file=mirrors_conf_file)
-        set_cfg = set(configured_mirror_paths(admin_dir, mirrors_conf_file))
+        cfg = sorted(_load_admin_index(admin_url, admin_dir, mirrors_conf_file).repos)
+        missing_in_config, missing_on_disk = _sorted_diff(sorted(disk_paths), cfg)
 
     return {
-        "bad_layout": sorted(bad_layout),
-        "missing_in_config": sorted(set_disk - set_cfg) if set_cfg is not None else None,
-        "missing_on_disk": sorted(set_cfg - set_disk) if set_cfg is not None else None,
+        # The walk only yields mirrors inside base_dir and every one maps to
+        # a gitolite path; the key stays for callers of the report format
+        "bad_layout": [],
+        "missing_in_config": missing_in_config,
+        "missing_on_disk": missing_on_disk,
         "last_sync": read_sync_time(base_dir),
     }
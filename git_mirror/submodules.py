@@ -2,52 +2,128 @@
 """Helpers for mirroring Git submodules."""
 
 from __future__ import annotations
+import functools
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Set, Tuple
 
-from .core import ensure_mirror, _run
+from .core import ensure_mirror, parse_repo_id, _run
 
+# Submodule clones are network-bound, but a superproject can list hundreds
+# of them; keep the number of concurrent git processes modest.
+SUBMODULE_JOBS = max(1, min(8, (os.cpu_count() or 4) * 3 // 4))
 
-def submodule_urls(repo_dir: Path) -> List[str]:
-    """Return submodule URLs defined in the repository's .gitmodules.
 
-    The repository is expected to be a bare mirror. We read the .gitmodules file
-    from HEAD using ``git config --blob``. If the repository has no submodules,
-    an empty list is returned.
+def _head_oid(repo_dir: Path) -> Optional[str]:
+    """Resolve HEAD of a bare repo by reading ref files, without running git.
+
+    Returns ``None`` if HEAD cannot be resolved this way (e.g. a reftable
+    repository or a nested symref).
     """
+    git_dir = os.fspath(repo_dir)
+    try:
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as fh:
+            head = fh.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        return head or None
+    ref = head[5:]
+    try:
+        with open(os.path.join(git_dir, ref), encoding="utf-8") as fh:
+            oid = fh.read().strip()
+        return None if oid.startswith("ref:") else oid
+    except OSError:
+        pass
+    # Mirrors keep most refs packed
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as fh:
+            for line in fh:
+                oid, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return oid
+    except OSError:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _submodule_urls_at(repo_dir: str, rev: str) -> Tuple[str, ...]:
     cp = _run(
         [
             "git",
             "--git-dir",
-            str(repo_dir),
+            repo_dir,
             "config",
             "--blob",
-            "HEAD:.gitmodules",
+            f"{rev}:.gitmodules",
             "--get-regexp",
-            r"submodule\\..*\\.url",
+            r"submodule\..*\.url",
         ],
         check=False,
+        capture=True,
     )
     if cp.returncode != 0:
-        return []
+        return ()
     urls: List[str] = []
     for line in cp.stdout.strip().splitlines():
         parts = line.strip().split(None, 1)
         if len(parts) == 2:
             urls.append(parts[1])
-    return urls
+    return tuple(urls)
+
+
+def submodule_urls(repo_dir: Path) -> List[str]:
+    """Return submodule URLs defined in the repository's .gitmodules.
+
+    The repository is expected to be a bare mirror. We read the .gitmodules file
+    from HEAD using ``git config --blob``. If the repository has no submodules,
+    an empty list is returned.
+
+    Results are cached per repository and HEAD commit, which is read from the
+    ref files directly, so superprojects sharing a submodule only spawn git
+    for it once per HEAD.
+    """
+    oid = _head_oid(repo_dir)
+    if oid is None:
+        return list(_submodule_urls_at.__wrapped__(str(repo_dir), "HEAD"))
+    return list(_submodule_urls_at(str(repo_dir), oid))
 
 
-def mirror_submodules(repo_dir: Path, base_dir: Path) -> List[Path]:
+def mirror_submodules(repo_dir: Path, base_dir: Path, jobs: int = SUBMODULE_JOBS) -> List[Path]:
     """Mirror all submodules of ``repo_dir`` under ``base_dir``.
 
-    Submodules are processed recursively. Returns a list of paths to mirrored
-    submodule repositories.
+    Submodules are processed recursively, with up to ``jobs`` clones or
+    fetches running at once; nested submodules are queued as soon as their
+    parent mirror is ready. Each mirror is visited once, so submodule cycles
+    terminate. Returns a list of paths to mirrored submodule repositories in
+    completion order.
     """
+    jobs = max(1, jobs)
     mirrored: List[Path] = []
-    for url in submodule_urls(repo_dir):
-        sub_repo = ensure_mirror(url, base_dir)
-        mirrored.append(sub_repo)
-        # Recurse into nested submodules
-        mirrored.extend(mirror_submodules(sub_repo, base_dir))
+    seen: Set[Path] = {repo_dir}
+    pending: Set[Future] = set()
+
+    def _queue(pool: ThreadPoolExecutor, parent: Path) -> None:
+        for url in submodule_urls(parent):
+            target = parse_repo_id(url).mirror_dir(base_dir)
+            if target not in seen:
+                seen.add(target)
+                pending.add(pool.submit(ensure_mirror, url, base_dir))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        try:
+            _queue(pool, repo_dir)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pending.discard(fut)
+                    sub_repo = fut.result()
+                    mirrored.append(sub_repo)
+                    # Queue nested submodules
+                    _queue(pool, sub_repo)
+        finally:
+            for fut in pending:
+                fut.cancel()
     return mirrored
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -32,7 +34,14 @@ WantedBy=timers.target
 
 
 def _unit_name(base: Path) -> str:
-    slug = base.resolve().as_posix().replace('/', '-').lstrip('-')
+    # abspath is lexical, so repeated calls for the same directory hit the cache
+    return _unit_name_for(os.path.abspath(base))
+
+
+@functools.lru_cache(maxsize=128)
+def _unit_name_for(base: str) -> str:
+    # Still resolve symlinks so existing unit names stay the same
+    slug = Path(base).resolve().as_posix().replace('/', '-').lstrip('-')
     return f"git-mirror-{slug}.service"
 
 
@@ -0,0 +1,17 @@
+from pathlib import Path
+import subprocess
+
+
+def git(*args: str) -> str:
+    """Run git with ``args`` and return its stdout."""
+    return subprocess.run(
+        ["git", *args], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ).stdout
+
+
+def fake_mirror(path: Path) -> Path:
+    """Create the ``config`` and ``HEAD`` files that mark ``path`` as a bare mirror."""
+    path.mkdir(parents=True)
+    (path / "config").write_text("")
+    (path / "HEAD").write_text("")
+    return path
@@ -0,0 +1,52 @@
+from argparse import Namespace
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import git_mirror.cli as cli
+from git_mirror.cli import _apply_config, cmd_clone, cmd_gitolite_add
+from git_mirror.config import set_value
+
+
+def test_apply_config_validates_jobs(tmp_path: Path) -> None:
+    def update_all() -> Namespace:
+        return Namespace(cmd="update-all", base_dir=str(tmp_path), jobs=None)
+
+    set_value(tmp_path, "jobs", "4")
+    assert _apply_config(update_all()).jobs == 4
+    set_value(tmp_path, "jobs", "many")
+    with pytest.raises(SystemExit, match="jobs"):
+        _apply_config(update_all())
+    with pytest.raises(SystemExit, match="jobs"):
+        _apply_config(Namespace(cmd="update-all", base_dir=str(tmp_path), jobs=0))
+    # Other commands ignore the jobs setting
+    assert not hasattr(_apply_config(Namespace(cmd="list", base_dir=str(tmp_path))), "jobs")
+
+
+def test_gitolite_add_rejects_bad_url_before_cloning_admin(tmp_path: Path) -> None:
+    admin_dir = tmp_path / "admin"
+    args = Namespace(
+        url=["https://github.com/psf/requests.git", "not a url"],
+        admin_url=str(tmp_path / "missing.git"),
+        admin_dir=str(admin_dir),
+        readers="@all",
+        prefix="mirrors",
+        conf_file="mirrors.conf",
+    )
+    with pytest.raises(SystemExit, match="not a url"):
+        cmd_gitolite_add(args)
+    assert not admin_dir.exists()
+
+
+def test_clone_skips_fork_lookup_for_existing_mirror(tmp_path: Path, monkeypatch) -> None:
+    url = "https://github.com/psf/requests.git"
+    (tmp_path / "github.com" / "psf" / "requests.git").mkdir(parents=True)
+    seen = []
+    monkeypatch.setattr(cli, "find_fork_reference", lambda *a: pytest.fail("probed forks"))
+    monkeypatch.setattr(cli, "ensure_mirror", lambda u, b, **kw: seen.append(kw["reference"]) or b)
+    args = Namespace(url=url, base_dir=str(tmp_path), reference=None, reference_forks=True, filter=None)
+    assert cmd_clone(args) == 0
+    assert seen == [None]
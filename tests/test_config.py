@@ -0,0 +1,27 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from git_mirror.config import find_base_dir, get_value, load_config, parse_config, set_value
+
+
+def test_set_value_is_visible_without_reparse(tmp_path: Path) -> None:
+    assert find_base_dir(tmp_path) is None
+    set_value(tmp_path, "prefix", "mirrors")
+    assert get_value(tmp_path, "prefix") == "mirrors"
+    assert load_config(tmp_path) is load_config(tmp_path)
+    assert find_base_dir(tmp_path) == tmp_path
+
+
+def test_parse_config_reads_only_git_mirror_section() -> None:
+    text = (
+        "[other]\nprefix = nope\n"
+        "[git-mirror]\n# comment\nAdmin-URL = git@host:gitolite-admin\nreaders: @all\n"
+        "admin-dir: ssh://git@h/gitolite-admin?x=y\n"
+    )
+    assert parse_config(text) == {
+        "admin-url": "git@host:gitolite-admin",
+        "readers": "@all",
+        "admin-dir": "ssh://git@h/gitolite-admin?x=y",
+    }
@@ -0,0 +1,222 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from git_mirror.gitolite import (
+    _PARSE_CACHE,
+    _sorted_diff,
+    _split_stanzas,
+    GitoliteBatch,
+    add_url_to_gitolite,
+    _gitolite_path_from_str,
+    commit_and_push,
+    ensure_admin_repo,
+    gitolite_path_from_mirror_dir,
+    load_mirrors_conf_index,
+    parse_mirrors_conf,
+    status_report,
+    sync_gitolite_from_disk,
+    upsert_mirror_repo,
+    upsert_mirror_repos_bulk,
+)
+
+from conftest import fake_mirror, git
+
+
+@pytest.fixture
+def admin_remote(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "t")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "t@t")
+    seed = tmp_path / "seed"
+    (seed / "conf").mkdir(parents=True)
+    (seed / "conf" / "gitolite.conf").write_text("repo gitolite-admin\n    RW+ = admin\n")
+    git("init", "-q", "-b", "main", str(seed))
+    git("-C", str(seed), "add", "conf")
+    git("-C", str(seed), "commit", "-q", "-m", "init")
+    remote = tmp_path / "gitolite-admin.git"
+    git("clone", "-q", "--bare", str(seed), str(remote))
+    return str(remote)
+
+
+def test_ensure_admin_repo_checks_out_main(tmp_path: Path, admin_remote: str) -> None:
+    admin_dir = ensure_admin_repo(admin_remote, tmp_path / "admin")
+    assert git("-C", str(admin_dir), "symbolic-ref", "--short", "HEAD").strip() == "main"
+    # A second call refreshes the existing checkout
+    assert ensure_admin_repo(admin_remote, admin_dir) == admin_dir
+
+
+def test_ensure_admin_repo_prefers_master(tmp_path: Path, admin_remote: str) -> None:
+    git("--git-dir", admin_remote, "branch", "master", "main")
+    admin_dir = ensure_admin_repo(admin_remote, tmp_path / "admin")
+    assert git("-C", str(admin_dir), "symbolic-ref", "--short", "HEAD").strip() == "master"
+    assert git("-C", str(admin_dir), "rev-parse", "--abbrev-ref", "@{u}").strip() == "origin/master"
+
+
+def test_sync_gitolite_adds_and_prunes_in_one_pass(tmp_path: Path, admin_remote: str) -> None:
+    base = tmp_path / "mirrors"
+    fake_mirror(base / "github.com" / "psf" / "requests.git")
+    fake_mirror(base / "gitlab.com" / "group" / "sub" / "repo.git")
+    admin_dir = tmp_path / "admin"
+    ensure_admin_repo(admin_remote, admin_dir)
+    (admin_dir / "conf" / "mirrors.conf").write_text("# Managed by git_mirror.gitolite\n")
+    upsert_mirror_repo(admin_dir, "mirrors/example.com/gone.git", readers="@staff")
+    fake_mirror(base / "solo.git")
+    upsert_mirror_repo(admin_dir, "mirrors/solo.git")
+
+    added, pruned = sync_gitolite_from_disk(base, admin_remote, admin_dir, prune=True)
+
+    assert added == [
+        "mirrors/github.com/psf/requests.git",
+        "mirrors/gitlab.com/group/sub/repo.git",
+    ]
+    assert pruned == ["mirrors/example.com/gone.git"]
+    text = (admin_dir / "conf" / "mirrors.conf").read_text()
+    assert "gone.git" not in text
+    assert "repo mirrors/github.com/psf/requests.git\n    R   = @all\n    RW+ =\n" in text
+    assert "mirrors.conf" in git("--git-dir", admin_remote, "show", "--stat", "HEAD")
+    assert sync_gitolite_from_disk(base, admin_remote, admin_dir, prune=True, parallel=False) == ([], [])
+
+
+def test_sync_gitolite_ignores_symlinked_mirror_aliases(tmp_path: Path, admin_remote: str) -> None:
+    base = tmp_path / "mirrors"
+    real = base / "github.com" / "org" / "repo.git"
+    fake_mirror(real)
+    (real.parent / "alias.git").symlink_to(real)
+    admin_dir = tmp_path / "admin"
+
+    assert sync_gitolite_from_disk(base, admin_remote, admin_dir) == (["mirrors/github.com/org/repo.git"], [])
+    assert sync_gitolite_from_disk(base, admin_remote, admin_dir, prune=True) == ([], [])
+    assert list(parse_mirrors_conf(admin_dir)) == ["mirrors/github.com/org/repo.git"]
+
+
+def test_parse_mirrors_conf_spans_and_cache(tmp_path: Path) -> None:
+    conf = tmp_path / "conf" / "mirrors.conf"
+    conf.parent.mkdir()
+    conf.write_text("# hdr\n\nrepo a\n    R = @all\n\n  REPO   b  \nrepo c\n")
+
+    spans = parse_mirrors_conf(tmp_path)
+    assert spans == {"a": (2, 5), "b": (5, 6), "c": (6, 7)}
+    assert parse_mirrors_conf(tmp_path) is spans
+    conf.write_text("repo d\n")
+    assert parse_mirrors_conf(tmp_path) == {"d": (0, 1)}
+
+
+def test_bulk_prune_keeps_order_and_spacing(tmp_path: Path) -> None:
+    conf = tmp_path / "conf" / "mirrors.conf"
+    conf.parent.mkdir()
+    conf.write_text("# Managed by git_mirror.gitolite\n")
+    names = [f"mirrors/example.com/r{i}.git" for i in range(50)]
+    upsert_mirror_repos_bulk(tmp_path, names)
+
+    changed, removed = upsert_mirror_repos_bulk(tmp_path, [], remove=names[::2])
+
+    assert changed == [] and removed == names[::2]
+    assert list(parse_mirrors_conf(tmp_path)) == names[1::2]
+    text = conf.read_text()
+    assert "\n\n\n" not in text
+    assert text.startswith("# Managed by git_mirror.gitolite\n\nrepo mirrors/example.com/r1.git\n")
+
+
+def test_gitolite_path_from_mirror_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo = tmp_path / "github.com" / "psf" / "requests.git"
+    assert gitolite_path_from_mirror_dir(tmp_path, repo) == "mirrors/github.com/psf/requests.git"
+    assert gitolite_path_from_mirror_dir(tmp_path, repo.with_name("bare"), prefix="m") == "m/github.com/psf/bare.git"
+    with pytest.raises(ValueError):
+        gitolite_path_from_mirror_dir(tmp_path / "sub", repo)
+    # Relative base dirs follow the current directory
+    monkeypatch.chdir(tmp_path)
+    assert gitolite_path_from_mirror_dir(Path("."), Path("x.git")) == "mirrors/x.git"
+    (tmp_path / "github.com").mkdir()
+    monkeypatch.chdir(tmp_path / "github.com")
+    assert gitolite_path_from_mirror_dir(Path("."), Path("x.git")) == "mirrors/x.git"
+    assert _gitolite_path_from_str("/srv/git/", "/srv/git/host/repo", "m/") == "m/host/repo.git"
+    with pytest.raises(ValueError):
+        _gitolite_path_from_str("/srv/git", "/srv/gitx/host/repo.git")
+
+
+def test_commit_and_push_only_commits_changes(tmp_path: Path, admin_remote: str) -> None:
+    admin_dir = ensure_admin_repo(admin_remote, tmp_path / "admin")
+    head = git("--git-dir", admin_remote, "rev-parse", "HEAD")
+    commit_and_push(admin_dir, "nothing")
+    assert git("--git-dir", admin_remote, "rev-parse", "HEAD") == head
+
+    (admin_dir / "conf" / "mirrors.conf").write_text("# Managed by git_mirror.gitolite\n")
+    commit_and_push(admin_dir, 'Add "quoted" $message')
+    assert git("--git-dir", admin_remote, "log", "-1", "--format=%s").strip() == 'Add "quoted" $message'
+
+
+def test_status_report_flags_unconfigured_and_missing(tmp_path: Path, admin_remote: str) -> None:
+    base = tmp_path / "mirrors"
+    fake_mirror(base / "github.com" / "psf" / "requests.git")
+    fake_mirror(base / "solo.git")
+    admin_dir = ensure_admin_repo(admin_remote, tmp_path / "admin")
+    (admin_dir / "conf" / "mirrors.conf").write_text("repo mirrors/example.com/gone.git\n")
+
+    report = status_report(base, admin_remote, admin_dir)
+
+    # A mirror directly in base_dir is an ordinary mirror
+    assert report["bad_layout"] == []
+    assert report["missing_in_config"] == ["mirrors/github.com/psf/requests.git", "mirrors/solo.git"]
+    assert report["missing_on_disk"] == ["mirrors/example.com/gone.git"]
+    assert status_report(base)["missing_in_config"] is None
+
+
+def test_new_stanza_is_appended_without_rewriting(tmp_path: Path) -> None:
+    conf = tmp_path / "conf" / "mirrors.conf"
+    conf.parent.mkdir()
+    original = b"repo a\r\n    R   = @all\r\n    RW+ =\r\n\r\nrepo b\n    R = @all"
+    conf.write_bytes(original)
+
+    res = upsert_mirror_repo(tmp_path, "c", readers="@all")
+
+    assert res.changed
+    assert conf.read_bytes() == original + b"\n\nrepo c\n    R   = @all\n    RW+ =\n\n"
+    assert list(parse_mirrors_conf(tmp_path)) == ["a", "b", "c"]
+
+
+def test_gitolite_batch_pushes_once(tmp_path: Path, admin_remote: str) -> None:
+    admin_dir = tmp_path / "admin"
+    with GitoliteBatch(admin_remote, admin_dir) as batch:
+        batch.add("https://github.com/psf/requests.git")
+        batch.add("git@github.com:numpy/numpy.git")
+
+    assert [r.path for r in batch.results if r.changed] == [
+        "mirrors/github.com/psf/requests.git",
+        "mirrors/github.com/numpy/numpy.git",
+    ]
+    assert git("--git-dir", admin_remote, "log", "-1", "--format=%s").strip() == "Add 2 mirrors"
+    assert git("--git-dir", admin_remote, "rev-list", "--count", "HEAD").strip() == "2"
+
+
+def test_sorted_diff_matches_set_difference() -> None:
+    left = ["a", "c", "d", "f"]
+    right = ["b", "c", "f", "g", "h"]
+    assert _sorted_diff(left, right) == (["a", "d"], ["b", "g", "h"])
+    assert _sorted_diff([], right) == ([], right)
+
+
+def test_upsert_refreshes_parse_cache(tmp_path: Path) -> None:
+    conf = tmp_path / "conf" / "mirrors.conf"
+    conf.parent.mkdir()
+    conf.write_bytes(b"repo a\r\n    R = @staff\r\n")
+    upsert_mirror_repo(tmp_path, "b")
+    appended = load_mirrors_conf_index(tmp_path)
+    upsert_mirror_repo(tmp_path, "a")
+    rewritten = load_mirrors_conf_index(tmp_path)
+
+    assert load_mirrors_conf_index(tmp_path) is rewritten is not appended
+    for index in (appended, rewritten):
+        assert index.stanzas == _split_stanzas(index.data)
+    _PARSE_CACHE.clear()
+    assert load_mirrors_conf_index(tmp_path).data == rewritten.data
+
+
+def test_add_url_rejects_bad_url_before_cloning_admin(tmp_path: Path, admin_remote: str) -> None:
+    admin_dir = tmp_path / "admin"
+    with pytest.raises(ValueError):
+        add_url_to_gitolite("not a url", admin_remote, admin_dir)
+    assert not admin_dir.exists()
@@ -0,0 +1,47 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from git_mirror.submodules import _head_oid, mirror_submodules, submodule_urls
+
+from conftest import git
+
+
+def _bare_repo(tmp_path: Path, name: str, submodules: list) -> Path:
+    """Create ``tmp_path/upstream/<name>.git`` whose .gitmodules lists ``submodules``."""
+    work = tmp_path / "work" / name
+    git("init", "-q", str(work))
+    gitmodules = "".join(
+        f'[submodule "{Path(url).stem}"]\n\tpath = {Path(url).stem}\n\turl = {url}\n' for url in submodules
+    )
+    (work / ".gitmodules").write_text(gitmodules)
+    git("-C", str(work), "add", ".gitmodules")
+    git("-C", str(work), "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+    bare = tmp_path / "upstream" / f"{name}.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    return bare
+
+
+def test_mirror_submodules_walks_nested_and_cyclic(tmp_path: Path) -> None:
+    upstream = tmp_path / "upstream"
+    leaf = _bare_repo(tmp_path, "leaf", [])
+    # mid refers back to top, forming a cycle
+    mid = _bare_repo(tmp_path, "mid", [str(leaf), str(upstream / "top.git")])
+    top = _bare_repo(tmp_path, "top", [str(mid), str(leaf)])
+    assert submodule_urls(top) == [str(mid), str(leaf)]
+
+    base = tmp_path / "mirrors"
+    mirrored = mirror_submodules(top, base, jobs=4)
+
+    local = base / "_local" / "upstream"
+    assert sorted(mirrored) == [local / "leaf.git", local / "mid.git", local / "top.git"]
+
+
+def test_head_oid_reads_loose_and_packed_refs(tmp_path: Path) -> None:
+    bare = _bare_repo(tmp_path, "repo", [])
+    head = git("--git-dir", str(bare), "rev-parse", "HEAD").strip()
+    assert _head_oid(bare) == head
+    git("--git-dir", str(bare), "pack-refs", "--all")
+    assert _head_oid(bare) == head
+    assert _head_oid(tmp_path / "absent.git") is None